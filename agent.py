@@ -10,44 +10,150 @@ This agent:
 """
 
 import asyncio
-import base64
-from datetime import datetime
+import hashlib
 import json
+import logging
 import os
+import sqlite3
 import sys
+import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List
-from urllib.parse import urlparse
+from typing import Any, Deque, Dict, List, Optional
 
-import requests
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import ClientSession
 from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from download_utils import (
+    DOWNLOADS_DIR,
+    derive_filename,
+    http_session,
+    reserve_path,
+    save_base64_file,
+    stream_to_file,
+)
+from mcp_utils import (
+    CACHE_DIR,
+    PARALLEL_SAFE_TOOLS,
+    append_turn,
+    build_openai_tools,
+    connect_playwright,
+    loads_json,
+)
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
+# Local cache for LLM responses ("off" or "read_write")
+OPENAI_CACHE_MODE = os.getenv("OPENAI_CACHE_MODE", "off")
+OPENAI_CACHE_TTL = int(os.getenv("OPENAI_CACHE_TTL", "86400"))
+
+# History compaction: older messages are folded into a summary message
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", "40"))
+OPENAI_SUMMARY_MODEL = os.getenv("OPENAI_SUMMARY_MODEL", "gpt-4o-mini")
+
 if not OPENAI_API_KEY:
     print("Error: OPENAI_API_KEY not found in .env file")
     print("Please add your OpenAI API key to the .env file")
     sys.exit(1)
 
 
+# Fixed system prompt; keeping it (and the tool list) byte-stable lets the
+# provider's prompt cache reuse the prefix across turns and sessions
+SYSTEM_PROMPT = (
+    "You are a Playwright browser automation agent. Use the browser tools to navigate, "
+    "inspect and interact with web pages. Use download_file to save files (PDF, Excel, CSV, ...) "
+    "to disk once you have found their URL, and save_screenshot to capture the current page."
+)
+
+# Read-only MCP tools whose results may be reused for identical arguments
+# within one assistant turn, with a lifetime in seconds. Any state-changing
+# tool call clears the cache, and so does the start of each turn.
+TOOL_RESULT_TTLS = {
+    "browser_snapshot": 30,
+    "browser_console_messages": 10,
+    "browser_network_requests": 10,
+}
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback for SDK objects (e.g. tool_calls) stored in the history"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+class ResponseCache:
+    """Small SQLite-backed cache of chat completions keyed by request hash"""
+
+    def __init__(self, path: Path, ttl: int = OPENAI_CACHE_TTL):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+        )
+
+    def get(self, key: str) -> ChatCompletion | None:
+        row = self._db.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires > ?",
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return ChatCompletion.model_validate_json(row[0])
+
+    def set(self, key: str, response: ChatCompletion):
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, expires, value) VALUES (?, ?, ?)",
+            (key, time.time() + self.ttl, response.model_dump_json())
+        )
+        self._db.commit()
+
+
 class PlaywrightAgent:
     """LLM Agent that uses Playwright MCP server for browser automation"""
 
-    def __init__(self):
+    def __init__(self, cache_mode: str = OPENAI_CACHE_MODE):
         self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        # Set cache_mode to "off" before side-effecting turns that must hit the API
+        self.cache_mode = cache_mode
+        self._response_cache: ResponseCache | None = None
         self.mcp_session: ClientSession | None = None
         self.available_tools: List[Dict[str, Any]] = []
-        self.conversation_history: List[Dict[str, Any]] = []
-        self.downloads_dir = Path("downloads")
-        self.downloads_dir.mkdir(exist_ok=True)
+        self._openai_tools_cache: Optional[List[Dict[str, Any]]] = None
+        self._tool_result_cache: Dict[str, Any] = {}
+        # A deque so compact_history can evict old messages from the front in O(1)
+        self.conversation_history: Deque[Dict[str, Any]] = deque([
+            {"role": "system", "content": SYSTEM_PROMPT}
+        ])
+        self._max_history_messages = MAX_HISTORY_MESSAGES
+        self.downloads_dir = DOWNLOADS_DIR
+
+        # Custom tools handled locally instead of by the MCP server. The
+        # download runs in a worker thread so the blocking HTTP transfer
+        # doesn't stall the event loop.
+        self._local_tools = {
+            "download_file": lambda args: asyncio.to_thread(
+                self.download_file,
+                url=args.get("url"),
+                filename=args.get("filename")
+            ),
+            "save_screenshot": lambda args: self.save_screenshot(
+                filename=args.get("filename")
+            ),
+        }
 
     def download_file(self, url: str, filename: str = None) -> str:
         """
@@ -64,26 +170,21 @@ class PlaywrightAgent:
         try:
             # Get filename from URL if not provided
             if not filename:
-                parsed = urlparse(url)
-                filename = os.path.basename(parsed.path)
-                if not filename:
-                    filename = "downloaded_file"
+                filename = derive_filename(url)
 
-            filepath = self.downloads_dir / filename
+            with reserve_path(self.downloads_dir / filename) as filepath:
+                filename = filepath.name
 
-            print(f"\n📥 Downloading from: {url}")
-            print(f"   Saving as: {filename}")
+                print(f"\n📥 Downloading from: {url}")
+                print(f"   Saving as: {filename}")
 
-            # Download the file
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
+                # Download the file
+                response = http_session.get(url, stream=True, timeout=30)
+                response.raise_for_status()
 
-            # Save to disk
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                # Save to disk
+                file_size = stream_to_file(response, filepath)
 
-            file_size = os.path.getsize(filepath)
             print(f"✅ Downloaded successfully! Size: {file_size:,} bytes")
             print(f"   Location: {filepath}")
 
@@ -100,26 +201,37 @@ class PlaywrightAgent:
         This wraps browser_take_screenshot and saves the result.
 
         Args:
-            filename: Optional custom filename. If not provided, uses timestamp
+            filename: Optional custom filename. If not provided, uses timestamp.
+                A .jpg/.jpeg extension saves a (much smaller) JPEG instead of PNG.
 
         Returns:
             Path to the saved screenshot
         """
         try:
-            # Generate filename with timestamp if not provided
+            # Generate filename with timestamp if not provided (nanoseconds,
+            # so back-to-back screenshots don't overwrite each other)
             if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"screenshot_{timestamp}.png"
-            elif not filename.endswith('.png'):
+                filename = f"screenshot_{time.time_ns()}.png"
+            elif not filename.lower().endswith(('.png', '.jpg', '.jpeg')):
                 filename = f"{filename}.png"
 
             filepath = self.downloads_dir / filename
 
+            # Let the browser encode JPEG directly when requested
+            screenshot_args = {}
+            if filepath.suffix.lower() in ('.jpg', '.jpeg'):
+                screenshot_args = self._jpeg_screenshot_args()
+                if not screenshot_args:
+                    # The server can only capture PNG; don't save it under a JPEG name
+                    print("⚠️  Server doesn't support JPEG screenshots, saving as PNG")
+                    filepath = filepath.with_suffix('.png')
+                    filename = filepath.name
+
             print(f"\n📸 Taking screenshot...")
             print(f"   Saving as: {filename}")
 
             # Call the MCP browser_take_screenshot tool
-            result = await self.mcp_session.call_tool("browser_take_screenshot", {})
+            result = await self.mcp_session.call_tool("browser_take_screenshot", screenshot_args)
 
             # Extract base64 image data from result
             screenshot_data = None
@@ -131,13 +243,9 @@ class PlaywrightAgent:
             if not screenshot_data:
                 return "Error: No screenshot data returned from browser"
 
-            # Decode base64 and save
-            img_bytes = base64.b64decode(screenshot_data)
-
-            with open(filepath, 'wb') as f:
-                f.write(img_bytes)
+            # Decode base64 and save (in a worker thread, off the event loop)
+            file_size = await asyncio.to_thread(save_base64_file, screenshot_data, filepath)
 
-            file_size = os.path.getsize(filepath)
             print(f"✅ Screenshot saved! Size: {file_size:,} bytes")
             print(f"   Location: {filepath}")
 
@@ -148,103 +256,143 @@ class PlaywrightAgent:
             print(f"❌ {error_msg}")
             return error_msg
 
+    def _jpeg_screenshot_args(self) -> Dict[str, Any]:
+        """
+        browser_take_screenshot arguments for a JPEG capture, as supported by the
+        server. Empty if the server has no image type option (PNG only).
+        """
+        schema = next(
+            (tool["input_schema"] for tool in self.available_tools
+             if tool["name"] == "browser_take_screenshot"),
+            {}
+        )
+        properties = schema.get("properties", {})
+
+        if "type" not in properties:
+            return {}
+
+        args: Dict[str, Any] = {"type": "jpeg"}
+        if "quality" in properties:
+            args["quality"] = 85
+        return args
+
+    def invalidate_tools_cache(self):
+        """Drop the cached OpenAI tool list (call after changing available_tools)"""
+        self._openai_tools_cache = None
+
     def convert_tools_for_openai(self) -> List[Dict[str, Any]]:
         """Convert MCP tools to OpenAI function calling format"""
-        openai_tools = []
-
-        # Add all MCP tools (browser automation)
-        for tool in self.available_tools:
-            openai_tool = {
+        # available_tools only changes at startup, so build the list once
+        if self._openai_tools_cache is not None:
+            return self._openai_tools_cache
+
+        # All MCP tools (browser automation) plus our custom tools, in a
+        # deterministic order regardless of how the MCP server lists its tools
+        openai_tools = build_openai_tools(self.available_tools, extra_tools=[
+            # Our custom download_file tool
+            {
                 "type": "function",
                 "function": {
-                    "name": tool["name"],
-                    "description": tool["description"],
-                    "parameters": tool["input_schema"]
-                }
-            }
-            openai_tools.append(openai_tool)
-
-        # Add our custom download_file tool
-        openai_tools.append({
-            "type": "function",
-            "function": {
-                "name": "download_file",
-                "description": (
-                    "Download a file (PDF, Excel, CSV, etc.) from a URL and save it to the downloads folder. "
-                    "Use this after finding the file URL on a webpage. "
-                    "Supports any file type: PDFs, Excel (.xlsx, .xls), CSV, images, etc."
-                ),
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "The direct URL of the file to download (e.g., https://example.com/file.pdf)"
+                    "name": "download_file",
+                    "description": (
+                        "Download a file (PDF, Excel, CSV, etc.) from a URL and save it to the downloads folder. "
+                        "Use this after finding the file URL on a webpage. "
+                        "Supports any file type: PDFs, Excel (.xlsx, .xls), CSV, images, etc."
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "url": {
+                                "type": "string",
+                                "description": "The direct URL of the file to download (e.g., https://example.com/file.pdf)"
+                            },
+                            "filename": {
+                                "type": "string",
+                                "description": "Optional: Custom filename to save as. If not provided, uses the filename from the URL"
+                            }
                         },
-                        "filename": {
-                            "type": "string",
-                            "description": "Optional: Custom filename to save as. If not provided, uses the filename from the URL"
-                        }
-                    },
-                    "required": ["url"]
+                        "required": ["url"]
+                    }
                 }
-            }
-        })
-
-        # Add our custom save_screenshot tool
-        openai_tools.append({
-            "type": "function",
-            "function": {
-                "name": "save_screenshot",
-                "description": (
-                    "Take a screenshot of the current browser page and save it to the downloads folder as a PNG image. "
-                    "Use this to capture the current state of a webpage."
-                ),
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "filename": {
-                            "type": "string",
-                            "description": "Optional: Custom filename (without .png extension). If not provided, uses timestamp"
+            },
+            # Our custom save_screenshot tool
+            {
+                "type": "function",
+                "function": {
+                    "name": "save_screenshot",
+                    "description": (
+                        "Take a screenshot of the current browser page and save it to the downloads folder as a PNG image. "
+                        "Use this to capture the current state of a webpage. "
+                        "Use a .jpg filename for a smaller JPEG when lossless quality isn't needed."
+                    ),
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "filename": {
+                                "type": "string",
+                                "description": (
+                                    "Optional: Custom filename (without extension for PNG, or ending in .jpg for JPEG). "
+                                    "If not provided, uses timestamp"
+                                )
+                            }
                         }
                     }
                 }
             }
-        })
+        ])
 
+        self._openai_tools_cache = openai_tools
         return openai_tools
 
+    async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call an MCP tool, reusing recent results of identical read-only calls"""
+        ttl = TOOL_RESULT_TTLS.get(tool_name)
+        if ttl is None:
+            if tool_name not in PARALLEL_SAFE_TOOLS:
+                # The page may change, so earlier read-only results are stale
+                self._tool_result_cache.clear()
+            return await self.mcp_session.call_tool(tool_name, arguments)
+
+        args_hash = hashlib.sha1(json.dumps(arguments, sort_keys=True).encode()).hexdigest()
+        key = f"{tool_name}:{args_hash}"
+
+        cached = self._tool_result_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            print("⚡ Reusing result of identical call")
+            return await cached[1]
+
+        # Store the task itself so concurrent duplicates share one call
+        task = asyncio.ensure_future(self.mcp_session.call_tool(tool_name, arguments))
+        self._tool_result_cache[key] = (time.monotonic() + ttl, task)
+        try:
+            return await task
+        except Exception:
+            self._tool_result_cache.pop(key, None)
+            raise
+
     async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Execute a tool (either MCP browser tool or custom download tool)"""
         print(f"\n🔧 Executing tool: {tool_name}")
-        print(f"   Arguments: {json.dumps(arguments, indent=2)}")
+        logger.debug("Arguments: %s", arguments)
 
         try:
-            # Handle our custom download_file tool
-            if tool_name == "download_file":
-                return self.download_file(
-                    url=arguments.get("url"),
-                    filename=arguments.get("filename")
-                )
-
-            # Handle our custom save_screenshot tool
-            if tool_name == "save_screenshot":
-                return await self.save_screenshot(
-                    filename=arguments.get("filename")
-                )
+            # Handle our custom tools (download_file, save_screenshot)
+            handler = self._local_tools.get(tool_name)
+            if handler is not None:
+                return await handler(arguments)
 
             # Handle MCP tools (browser automation)
-            result = await self.mcp_session.call_tool(tool_name, arguments)
+            result = await self.call_mcp_tool(tool_name, arguments)
 
             # Extract text content from result
             if result.content:
-                response_text = ""
-                for content_item in result.content:
-                    if hasattr(content_item, 'text'):
-                        response_text += content_item.text + "\n"
-
-                print(f"✅ Tool result: {response_text.strip()}")
-                return response_text.strip()
+                response_text = "\n".join(
+                    content_item.text for content_item in result.content
+                    if hasattr(content_item, 'text')
+                ).strip()
+                print(f"✅ Tool returned {len(response_text):,} chars")
+                logger.debug("Tool result: %s", response_text)
+                return response_text
 
             return "Tool executed successfully (no content returned)"
 
@@ -253,6 +401,150 @@ class PlaywrightAgent:
             print(f"❌ {error_msg}")
             return error_msg
 
+    async def execute_tool_calls(self, tool_calls: List[Any]) -> List[str]:
+        """
+        Execute the tool calls from one assistant turn.
+
+        Consecutive read-only calls (see PARALLEL_SAFE_TOOLS) run concurrently;
+        calls that change browser state run one at a time, in order.
+
+        Returns:
+            Tool results in the same order as tool_calls
+        """
+        # The page may have changed since the previous turn
+        self._tool_result_cache.clear()
+
+        results: List[str] = []
+        batch = []
+
+        async def flush_batch():
+            if batch:
+                results.extend(await asyncio.gather(*batch))
+                batch.clear()
+
+        for tool_call in tool_calls:
+            function_name = tool_call.function.name
+            function_args = loads_json(tool_call.function.arguments)
+            call = self.execute_tool(function_name, function_args)
+
+            if function_name in PARALLEL_SAFE_TOOLS:
+                batch.append(call)
+            else:
+                await flush_batch()
+                results.append(await call)
+
+        await flush_batch()
+        return results
+
+    def _summarize_messages(self, messages: List[Dict[str, Any]]) -> str:
+        """Summarize dropped history messages with the cheaper summary model"""
+        lines = []
+        for message in messages:
+            content = message.get("content") or ""
+            if message["role"] == "system":
+                content = content.removeprefix(SUMMARY_PREFIX)
+            for tool_call in message.get("tool_calls") or []:
+                content += f" [called {tool_call.function.name}({tool_call.function.arguments})]"
+            lines.append(f"{message['role']}: {content[:2000]}")
+
+        response = self.openai_client.chat.completions.create(
+            model=OPENAI_SUMMARY_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        "Summarize this browser automation session for the agent that will continue it. "
+                        "Keep URLs visited, files downloaded or saved, and any open tasks. Be concise."
+                    )
+                },
+                {"role": "user", "content": "\n".join(lines)}
+            ]
+        )
+        return response.choices[0].message.content or ""
+
+    async def compact_history(self):
+        """
+        Keep the history within _max_history_messages.
+
+        Leading system messages and the most recent messages are kept; the
+        messages in between are replaced by a single summary message. The cut
+        never lands on a tool result, so tool calls stay paired with results,
+        and never past the latest user message, so the request still being
+        worked on is kept verbatim (the kept part may then exceed half of the
+        limit).
+        """
+        history = self.conversation_history
+        if len(history) <= self._max_history_messages:
+            return
+
+        head = 0
+        while (head < len(history) and history[head]["role"] == "system"
+               and not (history[head]["content"] or "").startswith(SUMMARY_PREFIX)):
+            head += 1
+
+        # Keep tool results with the assistant message that called them by
+        # moving the cut back to that message
+        start = max(head, len(history) - self._max_history_messages // 2)
+        while start > head and history[start]["role"] == "tool":
+            start -= 1
+
+        # Never summarize away the user message that started the current turn
+        last_user = next(
+            (i for i in range(len(history) - 1, head - 1, -1) if history[i]["role"] == "user"),
+            None
+        )
+        if last_user is not None:
+            start = min(start, last_user)
+        if start <= head:
+            return
+
+        kept_head = [history.popleft() for _ in range(head)]
+        dropped = [history.popleft() for _ in range(start - head)]
+        try:
+            summary = await asyncio.to_thread(self._summarize_messages, dropped)
+        except Exception as e:
+            print(f"⚠️  Could not summarize history, dropping old messages: {e}")
+            summary = f"({len(dropped)} earlier messages were dropped)"
+
+        history.appendleft({"role": "system", "content": SUMMARY_PREFIX + summary})
+        history.extendleft(reversed(kept_head))
+
+    def _request_cache_key(self, request: Dict[str, Any]) -> str:
+        """
+        Stable hash of the request (model, messages, tools, tool_choice) for the
+        response cache.
+
+        The whole request is serialized on every call: earlier tool results
+        are trimmed between turns, so a hash of an earlier prefix can't be reused.
+        """
+        payload = json.dumps(request, sort_keys=True, default=_json_default)
+        return hashlib.blake2b(payload.encode(), digest_size=32).hexdigest()
+
+    def create_completion(self, openai_tools: List[Dict[str, Any]]) -> ChatCompletion:
+        """Call the OpenAI API, reusing a cached response for identical requests"""
+        request = {
+            "model": OPENAI_MODEL,
+            "messages": list(self.conversation_history),
+            "tools": openai_tools,
+            "tool_choice": "auto"
+        }
+
+        use_cache = self.cache_mode != "off"
+        if use_cache:
+            if self._response_cache is None:
+                self._response_cache = ResponseCache(CACHE_DIR / "responses.sqlite3")
+            key = self._request_cache_key(request)
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                print("⚡ Using cached LLM response")
+                return cached
+
+        response = self.openai_client.chat.completions.create(**request)
+
+        if use_cache:
+            self._response_cache.set(key, response)
+        return response
+
     async def process_user_message(self, user_message: str) -> str:
         """Process a user message and execute any needed tools"""
         print(f"\n💬 User: {user_message}")
@@ -273,44 +565,29 @@ class PlaywrightAgent:
         while iteration < max_iterations:
             iteration += 1
 
+            # Keep the prompt size bounded
+            await self.compact_history()
+
             # Get response from OpenAI
-            response = self.openai_client.chat.completions.create(
-                model=OPENAI_MODEL,
-                messages=self.conversation_history,
-                tools=openai_tools,
-                tool_choice="auto"
-            )
+            response = self.create_completion(openai_tools)
 
             assistant_message = response.choices[0].message
 
-            # Add assistant message to history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message.content,
-                "tool_calls": assistant_message.tool_calls
-            })
-
             # Check if the assistant wants to call tools
             if not assistant_message.tool_calls:
+                append_turn(self.conversation_history, assistant_message.content)
+
                 # No more tools to call, return the final response
                 final_response = assistant_message.content or "Done!"
                 print(f"\n🤖 Assistant: {final_response}")
                 return final_response
 
-            # Execute each tool call
-            for tool_call in assistant_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-
-                # Execute the tool via MCP
-                tool_result = await self.execute_tool(function_name, function_args)
-
-                # Add tool result to conversation history
-                self.conversation_history.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": tool_result
-                })
+            # Execute the tool calls and add the turn to history
+            tool_results = await self.execute_tool_calls(assistant_message.tool_calls)
+            append_turn(
+                self.conversation_history, assistant_message.content,
+                assistant_message.tool_calls, tool_results
+            )
 
         return "Maximum iterations reached. Please try a simpler request."
 
@@ -355,44 +632,30 @@ class PlaywrightAgent:
 
 async def main():
     """Main entry point"""
-    print("🔌 Connecting to Playwright MCP server...")
+    # LOG_LEVEL=DEBUG shows full tool arguments and results
+    log_level = os.getenv("LOG_LEVEL", "WARNING").upper()
+    if not isinstance(logging.getLevelName(log_level), int):
+        print(f"⚠️  Unknown LOG_LEVEL {log_level!r}, using WARNING")
+        log_level = "WARNING"
+    logging.basicConfig(level=log_level)
 
-    # Configure server
-    server_params = StdioServerParameters(
-        command="npx",
-        args=["-y", "@playwright/mcp@latest"],
-        env=None
-    )
+    print("🔌 Connecting to Playwright MCP server...")
 
     try:
-        # Connect using context manager properly
-        async with stdio_client(server_params) as (stdio, write):
-            async with ClientSession(stdio, write) as session:
-                await session.initialize()
-
-                # Create and initialize agent
-                agent = PlaywrightAgent()
-                agent.mcp_session = session
-
-                # Get available tools
-                tools_response = await session.list_tools()
-
-                print(f"✅ Connected! Found {len(tools_response.tools)} tools:")
-                for tool in tools_response.tools:
-                    print(f"  - {tool.name}: {tool.description[:60]}...")
-
-                # Store tools
-                agent.available_tools = [
-                    {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "input_schema": tool.inputSchema
-                    }
-                    for tool in tools_response.tools
-                ]
-
-                # Start interactive chat loop
-                await agent.chat_loop()
+        # Launch the server and connect (tools are cached on disk between runs)
+        async with connect_playwright() as (session, tools):
+            # Create and initialize agent
+            agent = PlaywrightAgent()
+            agent.mcp_session = session
+            agent.available_tools = tools
+            agent.invalidate_tools_cache()
+
+            print(f"✅ Connected! Found {len(agent.available_tools)} tools:")
+            for tool in agent.available_tools:
+                print(f"  - {tool['name']}: {tool['description'][:60]}...")
+
+            # Start interactive chat loop
+            await agent.chat_loop()
 
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
@@ -7,45 +7,25 @@ We'll use a government data source that has Excel files.
 """
 
 import asyncio
-import json
-import os
-from pathlib import Path
-from urllib.parse import urlparse
 
-import requests
-from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from openai import OpenAI
-
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+from download_utils import DOWNLOADS_DIR, derive_filename, http_session, stream_to_file
 
 
 def download_file(url: str, filename: str = None) -> str:
     """Download a file using Python requests"""
-    downloads_dir = Path("downloads")
-    downloads_dir.mkdir(exist_ok=True)
-
     if not filename:
-        parsed = urlparse(url)
-        filename = os.path.basename(parsed.path)
+        filename = derive_filename(url)
 
-    filepath = downloads_dir / filename
+    filepath = DOWNLOADS_DIR / filename
 
     print(f"\n📥 Downloading from: {url}")
     print(f"   Saving as: {filename}")
 
-    response = requests.get(url, stream=True, timeout=30)
+    response = http_session.get(url, stream=True, timeout=30)
     response.raise_for_status()
 
-    with open(filepath, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
+    file_size = stream_to_file(response, filepath)
 
-    file_size = os.path.getsize(filepath)
     print(f"✅ Downloaded successfully! Size: {file_size:,} bytes")
     print(f"   Location: {filepath.absolute()}")
 
@@ -80,9 +60,8 @@ async def demo_excel():
     print("="*70)
 
     # List all downloaded files
-    downloads_dir = Path("downloads")
-    if downloads_dir.exists():
-        files = list(downloads_dir.glob("*"))
+    if DOWNLOADS_DIR.exists():
+        files = list(DOWNLOADS_DIR.glob("*"))
         if files:
             print("\n📂 All downloaded files:")
             for f in files:
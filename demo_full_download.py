@@ -10,17 +10,22 @@ This demonstrates the complete workflow:
 """
 
 import asyncio
-import json
 import os
-from pathlib import Path
-from urllib.parse import urlparse
+from typing import Any, Dict, List
 
-import requests
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import ClientSession
 from openai import OpenAI
 
+from download_utils import DOWNLOADS_DIR, derive_filename, http_session, reserve_path, stream_to_file
+from mcp_utils import (
+    append_turn,
+    build_openai_tools,
+    connect_playwright,
+    format_json,
+    stream_tool_turn,
+)
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -29,32 +34,143 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
 def download_file(url: str, filename: str = None) -> str:
     """Download a file using Python requests"""
-    downloads_dir = Path("downloads")
-    downloads_dir.mkdir(exist_ok=True)
-
     if not filename:
-        parsed = urlparse(url)
-        filename = os.path.basename(parsed.path)
+        filename = derive_filename(url)
 
-    filepath = downloads_dir / filename
+    with reserve_path(DOWNLOADS_DIR / filename) as filepath:
+        filename = filepath.name
 
-    print(f"\n📥 Downloading from: {url}")
-    print(f"   Saving as: {filename}")
+        print(f"\n📥 Downloading from: {url}")
+        print(f"   Saving as: {filename}")
 
-    response = requests.get(url, stream=True, timeout=30)
-    response.raise_for_status()
+        response = http_session.get(url, stream=True, timeout=30)
+        response.raise_for_status()
 
-    with open(filepath, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
+        file_size = stream_to_file(response, filepath)
 
-    file_size = os.path.getsize(filepath)
     print(f"✅ Downloaded successfully! Size: {file_size:,} bytes")
     print(f"   Location: {filepath.absolute()}")
 
     return f"Successfully downloaded {filename} ({file_size:,} bytes) to {filepath}"
 
 
+async def run(session: ClientSession, openai_client: OpenAI, mcp_tools: List[Dict[str, Any]]):
+    """Run the demo on an existing MCP session (see demo_runner.py)"""
+    openai_tools = build_openai_tools(mcp_tools, extra_tools=[
+        # Our custom download_file tool
+        {
+            "type": "function",
+            "function": {
+                "name": "download_file",
+                "description": (
+                    "Download a file (PDF, Excel, CSV, etc.) from a URL and save it to the downloads folder. "
+                    "Use this after finding the file URL on a webpage."
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "url": {
+                            "type": "string",
+                            "description": "The direct URL of the file to download"
+                        },
+                        "filename": {
+                            "type": "string",
+                            "description": "Optional: Custom filename"
+                        }
+                    },
+                    "required": ["url"]
+                }
+            }
+        }
+    ])
+
+    print(f"✅ Total tools available (including download_file): {len(openai_tools)}")
+
+    # User request
+    user_request = """
+    Go to https://www.irs.gov/forms-instructions and find the direct URL
+    for Form W-4 PDF, then download it using the download_file tool.
+    """
+
+    print(f"\n💬 User: {user_request.strip()}")
+
+    messages = [{"role": "user", "content": user_request}]
+
+    async def execute(function_name: str, function_args: Dict[str, Any]) -> str:
+        print(f"\n🔧 Tool: {function_name}")
+        print(f"   Args: {format_json(function_args)}")
+
+        if function_name == "download_file":
+            # Use our Python download function
+            return await asyncio.to_thread(
+                download_file,
+                url=function_args.get("url"),
+                filename=function_args.get("filename")
+            )
+
+        # Use MCP tools
+        result = await session.call_tool(function_name, function_args)
+        result_text = "".join(
+            content_item.text for content_item in result.content
+            if hasattr(content_item, 'text')
+        )
+
+        # Show abbreviated result
+        if len(result_text) > 300:
+            print(f"   ✅ Result: {result_text[:300]}... (truncated)")
+        else:
+            print(f"   ✅ Result: {result_text}")
+
+        return result_text
+
+    # Multi-step loop
+    max_iterations = 10
+    iteration = 0
+
+    print("\n🔄 Starting workflow...\n")
+
+    while iteration < max_iterations:
+        iteration += 1
+        print(f"--- Iteration {iteration} ---")
+
+        # Stream GPT's reply. Tools run as soon as each call is complete;
+        # downloads and other read-only calls run concurrently.
+        content, tool_calls, tool_results = await stream_tool_turn(
+            openai_client,
+            execute,
+            model=OPENAI_MODEL,
+            messages=messages,
+            tools=openai_tools,
+            tool_choice="auto"
+        )
+
+        # Add to history (earlier tool results are trimmed)
+        append_turn(messages, content, tool_calls, tool_results)
+
+        # Check if done
+        if not tool_calls:
+            final_response = content or "Done!"
+            print(f"\n🤖 Assistant: {final_response}")
+            break
+
+        print()
+
+    print("\n" + "="*70)
+    print("🎉 Demo Complete!")
+    print("="*70)
+    print("\n📂 Check the downloads/ folder for your files!")
+    print()
+
+    # List downloaded files
+    if DOWNLOADS_DIR.exists():
+        files = list(DOWNLOADS_DIR.glob("*"))
+        if files:
+            print("Downloaded files:")
+            for f in files:
+                size = f.stat().st_size
+                print(f"  - {f.name} ({size:,} bytes)")
+
+
 async def demo_full_workflow():
     print("="*70)
     print("🎬 Full Download Workflow Demo")
@@ -67,161 +183,14 @@ async def demo_full_workflow():
 
     # Connect to Playwright MCP server
     print("\n🔌 Connecting to Playwright MCP server...")
-    server_params = StdioServerParameters(
-        command="npx",
-        args=["-y", "@playwright/mcp@latest"],
-        env=None
-    )
-
-    async with stdio_client(server_params) as (stdio, write):
-        async with ClientSession(stdio, write) as session:
-            await session.initialize()
-
-            tools_response = await session.list_tools()
-            print(f"✅ Connected! Found {len(tools_response.tools)} browser tools")
-
-            # Convert MCP tools to OpenAI format
-            openai_tools = []
-            for tool in tools_response.tools:
-                openai_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema
-                    }
-                })
-
-            # Add our custom download_file tool
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": "download_file",
-                    "description": (
-                        "Download a file (PDF, Excel, CSV, etc.) from a URL and save it to the downloads folder. "
-                        "Use this after finding the file URL on a webpage."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "url": {
-                                "type": "string",
-                                "description": "The direct URL of the file to download"
-                            },
-                            "filename": {
-                                "type": "string",
-                                "description": "Optional: Custom filename"
-                            }
-                        },
-                        "required": ["url"]
-                    }
-                }
-            })
-
-            print(f"✅ Total tools available (including download_file): {len(openai_tools)}")
-
-            # Initialize OpenAI
-            openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-            # User request
-            user_request = """
-            Go to https://www.irs.gov/forms-instructions and find the direct URL
-            for Form W-4 PDF, then download it using the download_file tool.
-            """
-
-            print(f"\n💬 User: {user_request.strip()}")
-
-            messages = [{"role": "user", "content": user_request}]
-
-            # Multi-step loop
-            max_iterations = 10
-            iteration = 0
-
-            print("\n🔄 Starting workflow...\n")
-
-            while iteration < max_iterations:
-                iteration += 1
-                print(f"--- Iteration {iteration} ---")
-
-                # Call GPT
-                response = openai_client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=messages,
-                    tools=openai_tools,
-                    tool_choice="auto"
-                )
-
-                assistant_message = response.choices[0].message
-
-                # Add to history
-                messages.append({
-                    "role": "assistant",
-                    "content": assistant_message.content,
-                    "tool_calls": assistant_message.tool_calls
-                })
-
-                # Check if done
-                if not assistant_message.tool_calls:
-                    final_response = assistant_message.content or "Done!"
-                    print(f"\n🤖 Assistant: {final_response}")
-                    break
-
-                # Execute tools
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-
-                    print(f"\n🔧 Tool: {function_name}")
-                    print(f"   Args: {json.dumps(function_args, indent=2)}")
-
-                    # Execute
-                    if function_name == "download_file":
-                        # Use our Python download function
-                        result_text = download_file(
-                            url=function_args.get("url"),
-                            filename=function_args.get("filename")
-                        )
-                    else:
-                        # Use MCP tools
-                        result = await session.call_tool(function_name, function_args)
-                        result_text = ""
-                        for content_item in result.content:
-                            if hasattr(content_item, 'text'):
-                                result_text += content_item.text
-
-                        # Show abbreviated result
-                        if len(result_text) > 300:
-                            print(f"   ✅ Result: {result_text[:300]}... (truncated)")
-                        else:
-                            print(f"   ✅ Result: {result_text}")
-
-                    # Add to conversation
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result_text
-                    })
-
-                print()
-
-            print("\n" + "="*70)
-            print("🎉 Demo Complete!")
-            print("="*70)
-            print("\n📂 Check the downloads/ folder for your files!")
-            print()
-
-            # List downloaded files
-            downloads_dir = Path("downloads")
-            if downloads_dir.exists():
-                files = list(downloads_dir.glob("*"))
-                if files:
-                    print("Downloaded files:")
-                    for f in files:
-                        size = f.stat().st_size
-                        print(f"  - {f.name} ({size:,} bytes)")
-
-            print("\n⏸️  Keeping browser open for 5 seconds...")
-            await asyncio.sleep(5)
+    async with connect_playwright() as (session, mcp_tools):
+        print(f"✅ Connected! Found {len(mcp_tools)} browser tools")
+
+        openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        await run(session, openai_client, mcp_tools)
+
+        print("\n⏸️  Keeping browser open for 5 seconds...")
+        await asyncio.sleep(5)
 
 
 if __name__ == "__main__":
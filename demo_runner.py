@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Demo Runner: run several demos on one browser session
+
+Launching `npx @playwright/mcp` and the browser dominates the start-up time
+of each demo, so this starts the server once and runs the selected demos
+one after another on the same MCP session and OpenAI client.
+
+Usage:
+    python demo_runner.py                      # run all demos
+    python demo_runner.py screenshot download  # run selected demos
+"""
+
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+import demo_full_download
+import demo_screenshot
+import demo_search_download
+from mcp_utils import connect_playwright
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+DEMOS = {
+    "search": demo_search_download.run,
+    "download": demo_full_download.run,
+    "screenshot": demo_screenshot.run,
+}
+
+
+async def run_demos(names):
+    print("\n🔌 Connecting to Playwright MCP server...")
+    async with connect_playwright() as (session, mcp_tools):
+        print(f"✅ Connected! Found {len(mcp_tools)} browser tools")
+
+        openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+        for name in names:
+            print("\n" + "="*70)
+            print(f"🎬 Running demo: {name}")
+            print("="*70)
+            await DEMOS[name](session, openai_client, mcp_tools)
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(DEMOS)
+    unknown = [name for name in names if name not in DEMOS]
+    if unknown:
+        print(f"❌ Unknown demo(s): {', '.join(unknown)}")
+        print(f"   Available: {', '.join(DEMOS)}")
+        sys.exit(1)
+
+    asyncio.run(run_demos(names))
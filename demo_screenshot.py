@@ -9,17 +9,23 @@ This demonstrates:
 """
 
 import asyncio
-import base64
-from datetime import datetime
-import json
 import os
-from pathlib import Path
+import time
+from typing import Any, Dict, List
 
 from dotenv import load_dotenv
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import ClientSession
 from openai import OpenAI
 
+from download_utils import DOWNLOADS_DIR, save_base64_file
+from mcp_utils import (
+    append_turn,
+    build_openai_tools,
+    connect_playwright,
+    format_json,
+    stream_tool_turn,
+)
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -28,27 +34,20 @@ OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
 async def save_screenshot(session, filename: str = None) -> str:
     """Helper to save screenshot"""
-    downloads_dir = Path("downloads")
-    downloads_dir.mkdir(exist_ok=True)
-
     if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshot_{timestamp}.png"
+        # Nanosecond timestamp: unique even for back-to-back screenshots
+        filename = f"screenshot_{time.time_ns()}.png"
     elif not filename.endswith('.png'):
         filename = f"{filename}.png"
 
-    filepath = downloads_dir / filename
+    filepath = DOWNLOADS_DIR / filename
 
     print(f"\n📸 Taking screenshot...")
     result = await session.call_tool("browser_take_screenshot", {})
 
     for content_item in result.content:
         if hasattr(content_item, 'data'):
-            img_bytes = base64.b64decode(content_item.data)
-            with open(filepath, 'wb') as f:
-                f.write(img_bytes)
-
-            file_size = os.path.getsize(filepath)
+            file_size = await asyncio.to_thread(save_base64_file, content_item.data, filepath)
             print(f"✅ Screenshot saved! Size: {file_size:,} bytes")
             print(f"   Location: {filepath}")
             return f"Successfully saved screenshot as {filename} ({file_size:,} bytes)"
@@ -56,147 +55,120 @@ async def save_screenshot(session, filename: str = None) -> str:
     return "Error: No screenshot data"
 
 
+async def run(session: ClientSession, openai_client: OpenAI, mcp_tools: List[Dict[str, Any]]):
+    """Run the demo on an existing MCP session (see demo_runner.py)"""
+    openai_tools = build_openai_tools(mcp_tools, extra_tools=[
+        # Custom save_screenshot tool
+        {
+            "type": "function",
+            "function": {
+                "name": "save_screenshot",
+                "description": "Take a screenshot and save it to downloads folder as PNG",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "filename": {
+                            "type": "string",
+                            "description": "Optional filename (without .png)"
+                        }
+                    }
+                }
+            }
+        }
+    ])
+
+    print(f"✅ Total tools (including save_screenshot): {len(openai_tools)}")
+
+    # User request
+    user_request = """
+    Navigate to https://www.irs.gov/forms-instructions and then
+    take a screenshot and save it as 'irs_forms_page'.
+    """
+
+    print(f"\n💬 User: {user_request.strip()}")
+
+    messages = [{"role": "user", "content": user_request}]
+
+    async def execute(function_name: str, function_args: Dict[str, Any]) -> str:
+        print(f"\n🔧 Tool: {function_name}")
+        print(f"   Args: {format_json(function_args)}")
+
+        if function_name == "save_screenshot":
+            return await save_screenshot(
+                session,
+                filename=function_args.get("filename")
+            )
+
+        result = await session.call_tool(function_name, function_args)
+        result_text = "".join(
+            content_item.text for content_item in result.content
+            if hasattr(content_item, 'text')
+        )
+
+        if len(result_text) > 300:
+            print(f"   ✅ Result: {result_text[:300]}... (truncated)")
+        else:
+            print(f"   ✅ Result: {result_text}")
+
+        return result_text
+
+    # Multi-step loop
+    max_iterations = 5
+    iteration = 0
+
+    print("\n🔄 Starting workflow...\n")
+
+    while iteration < max_iterations:
+        iteration += 1
+        print(f"--- Iteration {iteration} ---")
+
+        # Stream the reply; tools run as soon as each call is complete
+        content, tool_calls, tool_results = await stream_tool_turn(
+            openai_client,
+            execute,
+            model=OPENAI_MODEL,
+            messages=messages,
+            tools=openai_tools,
+            tool_choice="auto"
+        )
+
+        # Add to history (earlier tool results are trimmed)
+        append_turn(messages, content, tool_calls, tool_results)
+
+        if not tool_calls:
+            final_response = content or "Done!"
+            print(f"\n🤖 Assistant: {final_response}")
+            break
+
+        print()
+
+    print("\n" + "="*70)
+    print("🎉 Demo Complete!")
+    print("="*70)
+
+    # List screenshots
+    screenshots = list(DOWNLOADS_DIR.glob("*.png"))
+    if screenshots:
+        print("\n📸 Screenshots in downloads folder:")
+        for f in screenshots:
+            size = f.stat().st_size
+            print(f"  - {f.name} ({size:,} bytes)")
+
+
 async def demo_screenshot():
     print("="*70)
     print("📸 Screenshot Demo with LLM")
     print("="*70)
 
     print("\n🔌 Connecting to Playwright MCP server...")
-    server_params = StdioServerParameters(
-        command="npx",
-        args=["-y", "@playwright/mcp@latest"],
-        env=None
-    )
-
-    async with stdio_client(server_params) as (stdio, write):
-        async with ClientSession(stdio, write) as session:
-            await session.initialize()
-            tools_response = await session.list_tools()
-            print(f"✅ Connected! Found {len(tools_response.tools)} browser tools")
-
-            # Convert tools
-            openai_tools = []
-            for tool in tools_response.tools:
-                openai_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema
-                    }
-                })
-
-            # Add custom save_screenshot tool
-            openai_tools.append({
-                "type": "function",
-                "function": {
-                    "name": "save_screenshot",
-                    "description": "Take a screenshot and save it to downloads folder as PNG",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {
-                                "type": "string",
-                                "description": "Optional filename (without .png)"
-                            }
-                        }
-                    }
-                }
-            })
-
-            print(f"✅ Total tools (including save_screenshot): {len(openai_tools)}")
-
-            # Initialize OpenAI
-            openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-            # User request
-            user_request = """
-            Navigate to https://www.irs.gov/forms-instructions and then
-            take a screenshot and save it as 'irs_forms_page'.
-            """
-
-            print(f"\n💬 User: {user_request.strip()}")
-
-            messages = [{"role": "user", "content": user_request}]
-
-            # Multi-step loop
-            max_iterations = 5
-            iteration = 0
-
-            print("\n🔄 Starting workflow...\n")
-
-            while iteration < max_iterations:
-                iteration += 1
-                print(f"--- Iteration {iteration} ---")
-
-                response = openai_client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=messages,
-                    tools=openai_tools,
-                    tool_choice="auto"
-                )
-
-                assistant_message = response.choices[0].message
-
-                messages.append({
-                    "role": "assistant",
-                    "content": assistant_message.content,
-                    "tool_calls": assistant_message.tool_calls
-                })
-
-                if not assistant_message.tool_calls:
-                    final_response = assistant_message.content or "Done!"
-                    print(f"\n🤖 Assistant: {final_response}")
-                    break
-
-                # Execute tools
-                for tool_call in assistant_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-
-                    print(f"\n🔧 Tool: {function_name}")
-                    print(f"   Args: {json.dumps(function_args, indent=2)}")
-
-                    if function_name == "save_screenshot":
-                        result_text = await save_screenshot(
-                            session,
-                            filename=function_args.get("filename")
-                        )
-                    else:
-                        result = await session.call_tool(function_name, function_args)
-                        result_text = ""
-                        for content_item in result.content:
-                            if hasattr(content_item, 'text'):
-                                result_text += content_item.text
-
-                        if len(result_text) > 300:
-                            print(f"   ✅ Result: {result_text[:300]}... (truncated)")
-                        else:
-                            print(f"   ✅ Result: {result_text}")
-
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": result_text
-                    })
-
-                print()
-
-            print("\n" + "="*70)
-            print("🎉 Demo Complete!")
-            print("="*70)
-
-            # List screenshots
-            downloads_dir = Path("downloads")
-            screenshots = list(downloads_dir.glob("*.png"))
-            if screenshots:
-                print("\n📸 Screenshots in downloads folder:")
-                for f in screenshots:
-                    size = f.stat().st_size
-                    print(f"  - {f.name} ({size:,} bytes)")
-
-            print("\n⏸️  Keeping browser open for 5 seconds...")
-            await asyncio.sleep(5)
+    async with connect_playwright() as (session, mcp_tools):
+        print(f"✅ Connected! Found {len(mcp_tools)} browser tools")
+
+        openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        await run(session, openai_client, mcp_tools)
+
+        print("\n⏸️  Keeping browser open for 5 seconds...")
+        await asyncio.sleep(5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+Helpers shared by the agent and demo scripts for saving downloads to disk
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # SIMD-accelerated decoder, noticeably faster on multi-MB screenshots
+    from pybase64 import b64decode
+except ImportError:
+    # Reads str input in place; base64.b64decode would first copy it to bytes
+    from binascii import a2b_base64 as b64decode
+
+load_dotenv()
+
+# Where downloads and screenshots are saved
+DOWNLOADS_DIR = Path("downloads")
+DOWNLOADS_DIR.mkdir(exist_ok=True)
+
+# Size of the reusable buffers used to stream response bodies to disk
+BUFFER_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Base64 characters decoded per slice (must be a multiple of 4)
+BASE64_CHUNK_SIZE = 64 * 1024
+
+_BUFFER_POOL: "queue.LifoQueue[bytearray]" = queue.LifoQueue()
+
+# Paths currently being written by a download, see reserve_path
+_reserved_paths = set()
+_reserved_lock = threading.Lock()
+
+# Shared HTTP session so repeated downloads reuse TCP/TLS connections;
+# connection errors and 429/5xx responses are retried with backoff
+_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    raise_on_status=False  # Let callers see the final response via raise_for_status
+)
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=_retry))
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=_retry))
+
+
+@lru_cache(maxsize=256)
+def derive_filename(url: str) -> str:
+    """Filename to save a URL as: the last path segment, or a generic default"""
+    return os.path.basename(urlparse(url).path) or "downloaded_file"
+
+
+@contextmanager
+def reserve_path(filepath: Path):
+    """
+    Reserve a destination path for the duration of a download.
+
+    Concurrent downloads that derive the same filename (e.g. `.../download?id=1`
+    and `?id=2`) would write the same file; later ones get a numbered
+    `name_2.ext`, `name_3.ext`, ... instead. Yields the path to write to.
+    """
+    with _reserved_lock:
+        candidate = filepath
+        n = 1
+        while candidate in _reserved_paths:
+            n += 1
+            candidate = filepath.with_name(f"{filepath.stem}_{n}{filepath.suffix}")
+        _reserved_paths.add(candidate)
+    try:
+        yield candidate
+    finally:
+        with _reserved_lock:
+            _reserved_paths.discard(candidate)
+
+
+def _acquire_buffer() -> bytearray:
+    try:
+        return _BUFFER_POOL.get_nowait()
+    except queue.Empty:
+        return bytearray(BUFFER_SIZE)
+
+
+def stream_to_file(response: requests.Response, filepath: Path) -> int:
+    """
+    Stream a response body (requested with stream=True) into a file.
+
+    Reads straight into a pooled BUFFER_SIZE buffer instead of allocating a new
+    bytes object per chunk.
+
+    Args:
+        response: Streaming response from requests
+        filepath: Destination file
+
+    Returns:
+        Number of bytes written
+    """
+    response.raw.decode_content = True
+    buffer = _acquire_buffer()
+    view = memoryview(buffer)
+    written = 0
+
+    try:
+        with open(filepath, 'wb') as f:
+            # Reserve the space upfront when the body size is known
+            expected = int(response.headers.get("Content-Length", 0))
+            compressed = "Content-Encoding" in response.headers
+            if expected and not compressed and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, expected)
+                except OSError:
+                    pass  # Filesystem doesn't support preallocation
+
+            while True:
+                n = response.raw.readinto(view)
+                if not n:
+                    break
+                f.write(view[:n])
+                written += n
+
+            # Drop any preallocated space the body didn't fill
+            f.truncate(written)
+
+            # Downloads are rarely read back right away; let the kernel evict
+            # them from the page cache. Dirty pages aren't evicted, so write
+            # the data out first.
+            if hasattr(os, "posix_fadvise"):
+                f.flush()
+                try:
+                    os.fdatasync(f.fileno())
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                except OSError:
+                    pass  # Only a cache hint; the download itself succeeded
+    except BaseException:
+        # Don't leave a truncated (or preallocated, zero-filled) file behind
+        filepath.unlink(missing_ok=True)
+        raise
+    finally:
+        view.release()
+        _BUFFER_POOL.put(buffer)
+
+    return written
+
+
+def save_base64_file(data: str, filepath: Path) -> int:
+    """
+    Decode base64 data (e.g. a screenshot from the MCP server) into a file.
+
+    Decodes in fixed-size slices so the full decoded image is never held in
+    memory at once; a large write buffer coalesces the slices into few writes.
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    with open(filepath, 'wb', buffering=BUFFER_SIZE) as f:
+        for start in range(0, len(data), BASE64_CHUNK_SIZE):
+            decoded = b64decode(data[start:start + BASE64_CHUNK_SIZE])
+            f.write(decoded)
+            written += len(decoded)
+    return written
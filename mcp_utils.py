@@ -0,0 +1,348 @@
+"""
+Helpers shared by the agent and demo scripts for working with the
+Playwright MCP server and OpenAI function calling
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Collection, Dict, Iterable, List, MutableSequence, Optional, Tuple
+)
+
+from dotenv import load_dotenv
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.types import InitializeResult
+
+try:
+    # Faster JSON for the tool call arguments parsed on every LLM turn
+    import orjson
+except ImportError:
+    orjson = None
+
+load_dotenv()
+
+# On-disk cache for tool lists (and the agent's LLM responses)
+CACHE_DIR = Path(os.getenv("PLAYWRIGHT_AGENT_CACHE_DIR", "~/.cache/playwright_agent")).expanduser()
+
+# How long the MCP tool list is reused across runs (0 disables the cache)
+TOOLS_CACHE_TTL = int(os.getenv("TOOLS_CACHE_TTL", "3600"))
+
+# Characters of each earlier tool result kept in the conversation (0 disables trimming)
+TOOL_RESULT_LIMIT = int(os.getenv("TOOL_RESULT_LIMIT", "4000"))
+
+# Tools that don't change browser state and can safely run concurrently
+PARALLEL_SAFE_TOOLS = {
+    "download_file",
+    "save_screenshot",
+    "browser_snapshot",
+    "browser_take_screenshot",
+    "browser_console_messages",
+    "browser_network_requests",
+}
+
+# Microsoft Playwright MCP server, launched via npx
+PLAYWRIGHT_SERVER = StdioServerParameters(
+    command="npx",
+    args=["-y", "@playwright/mcp@latest"],
+    env=None
+)
+
+
+def loads_json(data: str) -> Any:
+    """Parse JSON such as tool call arguments (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def format_json(obj: Any) -> str:
+    """Pretty-print JSON with a 2-space indent for console output"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def server_cache_key(server_params: StdioServerParameters, server_version: Optional[str] = None) -> str:
+    """Identify an MCP server by its launch command and reported version"""
+    command = json.dumps([server_params.command, *server_params.args, server_version])
+    return hashlib.blake2b(command.encode(), digest_size=8).hexdigest()
+
+
+async def cached_list_tools(
+    session: ClientSession,
+    server_key: str,
+    ttl: int = TOOLS_CACHE_TTL
+) -> List[Dict[str, Any]]:
+    """
+    List the MCP server's tools, reusing a recent result from disk.
+
+    Args:
+        session: Initialized MCP client session
+        server_key: Identifier of the server (see server_cache_key)
+        ttl: Maximum age of the cached list in seconds (0 disables the cache)
+
+    Returns:
+        List of {"name", "description", "input_schema"} dicts
+    """
+    cache_file = CACHE_DIR / f"tools_{server_key}.json"
+
+    if ttl > 0:
+        try:
+            cached = json.loads(cache_file.read_text())
+            if time.time() - cached["timestamp"] < ttl:
+                return cached["tools"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    tools_response = await session.list_tools()
+    tools = [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "input_schema": tool.inputSchema
+        }
+        for tool in tools_response.tools
+    ]
+
+    if ttl > 0:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"timestamp": time.time(), "tools": tools}))
+
+    return tools
+
+
+def build_openai_tools(
+    tools: List[Dict[str, Any]],
+    extra_tools: Iterable[Dict[str, Any]] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Convert MCP tools (as returned by cached_list_tools) to OpenAI function calling format.
+
+    Args:
+        tools: MCP tools to convert
+        extra_tools: Custom tools already in OpenAI format (e.g. download_file)
+
+    Tools are sorted by name so the request prefix is identical across calls
+    and eligible for OpenAI prompt caching.
+    """
+    openai_tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": tool["name"],
+                "description": tool["description"],
+                "parameters": tool["input_schema"]
+            }
+        }
+        for tool in tools
+    ]
+    openai_tools.extend(extra_tools)
+    openai_tools.sort(key=lambda t: t["function"]["name"])
+    return openai_tools
+
+
+def compress_tool_result(text: str, limit: int = TOOL_RESULT_LIMIT) -> str:
+    """
+    Shorten a tool result to at most limit characters.
+
+    Keeps the beginning and end of the text and replaces the middle with a
+    note of how much was elided. Text that already fits is returned as is,
+    so compressing twice is harmless.
+    """
+    if limit <= 0 or len(text) <= limit:
+        return text
+
+    keep = max(limit - 48, 0)  # Room for the elision note
+    head = keep // 2
+    tail = keep - head
+    return f"{text[:head]}\n...[{len(text) - keep:,} chars elided]...\n{text[len(text) - tail:]}"
+
+
+def trim_tool_results(messages: Iterable[Dict[str, Any]], limit: int = TOOL_RESULT_LIMIT) -> bool:
+    """
+    Compress the tool results already in a conversation.
+
+    Call before appending new tool results: the model needs the latest
+    results (e.g. a page snapshot it is about to act on) in full, but
+    re-sending every earlier snapshot makes each request grow with the
+    whole history.
+
+    Returns:
+        True if any message was changed
+    """
+    changed = False
+    for message in messages:
+        if message.get("role") == "tool":
+            content = message["content"]
+            trimmed = compress_tool_result(content, limit)
+            if trimmed is not content:
+                message["content"] = trimmed
+                changed = True
+    return changed
+
+
+def append_turn(
+    messages: MutableSequence[Dict[str, Any]],
+    content: Optional[str],
+    tool_calls: Optional[List[Any]] = None,
+    tool_results: Iterable[str] = (),
+    limit: int = TOOL_RESULT_LIMIT
+) -> bool:
+    """
+    Add an assistant turn and its tool results to a conversation.
+
+    Earlier tool results are compressed first (see trim_tool_results); the
+    new results are added in full, in the order the tools were called.
+
+    Args:
+        messages: Conversation history to extend
+        content: Assistant message text
+        tool_calls: The turn's tool calls, as dicts or OpenAI SDK objects
+        tool_results: Result text for each tool call
+
+    Returns:
+        True if an earlier message was changed
+    """
+    assistant_entry: Dict[str, Any] = {"role": "assistant", "content": content}
+    if not tool_calls:
+        messages.append(assistant_entry)
+        return False
+
+    # Left out rather than sent as null when there are no calls
+    assistant_entry["tool_calls"] = tool_calls
+    changed = trim_tool_results(messages, limit)
+    messages.append(assistant_entry)
+
+    for tool_call, result_text in zip(tool_calls, tool_results):
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call["id"] if isinstance(tool_call, dict) else tool_call.id,
+            "content": result_text
+        })
+    return changed
+
+
+async def _run_after(waits: List[asyncio.Task], call: Awaitable[str]) -> str:
+    if waits:
+        await asyncio.wait(waits)
+    return await call
+
+
+async def stream_tool_turn(
+    openai_client,
+    execute: Callable[[str, Dict[str, Any]], Awaitable[str]],
+    parallel_tools: Collection[str] = PARALLEL_SAFE_TOOLS,
+    **create_kwargs
+) -> Tuple[Optional[str], List[Dict[str, Any]], List[str]]:
+    """
+    Stream one assistant turn and run each tool call as soon as it is complete.
+
+    A tool call's arguments are complete once the model starts the next call
+    (or the stream ends), so tools run while the rest of the turn is still
+    being generated. Calls that change browser state wait for every earlier
+    call; consecutive read-only calls (parallel_tools) only wait for the last
+    state-changing call and run concurrently with each other.
+
+    Args:
+        openai_client: OpenAI client
+        execute: Coroutine function called with (name, arguments) for each tool call
+        parallel_tools: Tools that don't change the browser state
+        **create_kwargs: Passed to chat.completions.create
+
+    Returns:
+        (content, tool_calls, results) where tool_calls are in the message format
+        expected back in the conversation and results are in the same order
+    """
+    stream = await asyncio.to_thread(
+        openai_client.chat.completions.create, stream=True, **create_kwargs
+    )
+    chunks = iter(stream)
+
+    content_parts: List[str] = []
+    tool_calls: List[Dict[str, Any]] = []
+    argument_parts: List[List[str]] = []
+    tasks: List[asyncio.Task] = []
+    last_mutation: List[asyncio.Task] = []  # Last state-changing call, if any
+    read_only: List[asyncio.Task] = []  # Read-only calls made since then
+
+    def dispatch(index: int):
+        function = tool_calls[index]["function"]
+        function["arguments"] = "".join(argument_parts[index]) or "{}"
+        call = execute(function["name"], loads_json(function["arguments"]))
+
+        if function["name"] in parallel_tools:
+            task = asyncio.create_task(_run_after(list(last_mutation), call))
+            read_only.append(task)
+        else:
+            task = asyncio.create_task(_run_after(last_mutation + read_only, call))
+            last_mutation[:] = [task]
+            read_only.clear()
+        tasks.append(task)
+
+    # The sync stream blocks on the network, so pull chunks in a worker thread
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            content_parts.append(delta.content)
+
+        for fragment in delta.tool_calls or []:
+            if fragment.index == len(tool_calls):
+                # A new call starts, so the previous one is complete
+                if tool_calls:
+                    dispatch(len(tool_calls) - 1)
+                tool_calls.append({
+                    "id": fragment.id,
+                    "type": "function",
+                    "function": {"name": fragment.function.name, "arguments": ""}
+                })
+                argument_parts.append([])
+            if fragment.function and fragment.function.arguments:
+                argument_parts[fragment.index].append(fragment.function.arguments)
+
+    if tool_calls:
+        dispatch(len(tool_calls) - 1)
+
+    results = await asyncio.gather(*tasks)
+    return "".join(content_parts) or None, tool_calls, list(results)
+
+
+@asynccontextmanager
+async def mcp_session(
+    server_params: StdioServerParameters = PLAYWRIGHT_SERVER
+) -> AsyncIterator[Tuple[ClientSession, InitializeResult]]:
+    """
+    Launch the MCP server and open an initialized session.
+
+    Yields:
+        (session, init_result) where init_result is the server's initialize reply
+    """
+    async with stdio_client(server_params) as (stdio, write):
+        async with ClientSession(stdio, write) as session:
+            init_result = await session.initialize()
+            yield session, init_result
+
+
+@asynccontextmanager
+async def connect_playwright(
+    server_params: StdioServerParameters = PLAYWRIGHT_SERVER
+) -> AsyncIterator[Tuple[ClientSession, List[Dict[str, Any]]]]:
+    """
+    Launch the MCP server and open an initialized session with its tool list.
+
+    Yields:
+        (session, tools) where tools is the cached_list_tools result
+    """
+    async with mcp_session(server_params) as (session, init_result):
+        tools = await cached_list_tools(
+            session, server_cache_key(server_params, init_result.serverInfo.version)
+        )
+        yield session, tools
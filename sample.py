@@ -21,8 +21,7 @@ async def setup_browser(self):
         prefs_file.mkdir(exist_ok=True)
         
         import json
-        with open(prefs_file / "Preferences", "w") as f:
-            json.dump({"download": prefs}, f)
+        (prefs_file / "Preferences").write_text(json.dumps({"download": prefs}))
         
         browser_args = [
             f"--user-data-dir={custom_profile}",
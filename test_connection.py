@@ -2,47 +2,38 @@
 """Simple test to verify MCP connection to Playwright server"""
 
 import asyncio
+import os
 import sys
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import traceback
+
+from mcp_utils import mcp_session
 
 
 async def test_connection():
     print("🧪 Testing MCP connection to Playwright server...")
 
     try:
-        # Configure server
-        server_params = StdioServerParameters(
-            command="npx",
-            args=["-y", "@playwright/mcp@latest"],
-            env=None
-        )
-
         print("📡 Launching Playwright MCP server...")
 
-        # Connect using context manager properly
-        async with stdio_client(server_params) as (stdio, write):
-            # Initialize session
-            async with ClientSession(stdio, write) as session:
-                await session.initialize()
-
-                print("✅ MCP session initialized!")
+        async with mcp_session() as (session, _):
+            print("✅ MCP session initialized!")
 
-                # Get available tools
-                tools_response = await session.list_tools()
+            # Get available tools
+            tools_response = await session.list_tools()
 
-                print(f"\n📦 Found {len(tools_response.tools)} tools:")
-                for i, tool in enumerate(tools_response.tools, 1):
-                    print(f"  {i}. {tool.name}")
-                    print(f"     {tool.description[:80]}...")
+            print(f"\n📦 Found {len(tools_response.tools)} tools:")
+            for i, tool in enumerate(tools_response.tools, 1):
+                print(f"  {i}. {tool.name}")
+                print(f"     {tool.description[:80]}...")
 
-                print("\n✅ Connection test successful!")
-                return True
+            print("\n✅ Connection test successful!")
+            return True
 
     except Exception as e:
         print(f"\n❌ Connection test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        # MCP_TEST_VERBOSE=1 prints the full traceback
+        if os.getenv("MCP_TEST_VERBOSE"):
+            traceback.print_exc()
         return False
 
 